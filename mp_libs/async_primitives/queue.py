@@ -3,16 +3,29 @@
 Based on Python's asyncio.queues.Queue implementation.
 """
 import asyncio
+from micropython import const
+
+# Constants
+DEFAULT_CAPACITY = const(16)  # Initial ring buffer capacity for unbounded queues
 
 
 class AsyncQueue:
     """Async queue that supports both awaitable/blocking and non-blocking get and put API's."""
     def __init__(self, maxsize: int = 0) -> None:
         self._maxsize = maxsize
-        self._queue = []
+
+        # Items are stored in a ring buffer so both get and put are O(1). Bounded queues never
+        # need to grow, unbounded queues double their capacity whenever the buffer fills up.
+        self._queue = [None] * (maxsize if maxsize > 0 else DEFAULT_CAPACITY)
+        self._head = 0
+        self._count = 0
         self._event_put = asyncio.Event()
         self._event_get = asyncio.Event()
 
+        # Number of tasks blocked in get()/put(). Events are only signaled when someone is waiting.
+        self._getters_waiting = 0
+        self._putters_waiting = 0
+
     def __repr__(self):
         return f'<{type(self).__name__} at {id(self):#x} {self._format()}>'
 
@@ -20,18 +33,36 @@ class AsyncQueue:
         return f'<{type(self).__name__} {self._format()}>'
 
     def _format(self):
-        result = f"maxsize={self._maxsize!r} _queue={list(self._queue)!r}"
+        result = f"maxsize={self._maxsize!r} _queue={self._items()!r}"
         return result
 
     def _get(self):
-        self._event_get.set()  # Schedule all tasks waiting on this event
-        self._event_get.clear()
-        return self._queue.pop(0)
+        if self._putters_waiting:
+            self._event_get.set()  # Schedule all tasks waiting on this event
+            self._event_get.clear()
+        queue = self._queue
+        val = queue[self._head]
+        queue[self._head] = None  # Don't hold on to references of removed items
+        self._head = (self._head + 1) % len(queue)
+        self._count -= 1
+        return val
+
+    def _grow(self):
+        self._queue = self._items() + [None] * len(self._queue)
+        self._head = 0
+
+    def _items(self) -> list:
+        queue = self._queue
+        return [queue[(self._head + i) % len(queue)] for i in range(self._count)]
 
     def _put(self, val):
-        self._event_put.set()  # Schedule tasks waiting on this event
-        self._event_put.clear()
-        self._queue.append(val)
+        if self._getters_waiting:
+            self._event_put.set()  # Schedule tasks waiting on this event
+            self._event_put.clear()
+        if self._count == len(self._queue):
+            self._grow()
+        self._queue[(self._head + self._count) % len(self._queue)] = val
+        self._count += 1
 
     def empty(self) -> bool:
         """Check if queue is empty.
@@ -39,7 +70,7 @@ class AsyncQueue:
         Returns:
             bool: True if the queue is empty, False otherwise.
         """
-        return len(self._queue) == 0
+        return self._count == 0
 
     def full(self) -> bool:
         """Check if queue is full.
@@ -64,7 +95,11 @@ class AsyncQueue:
         """
         while self.empty():
             # Queue is empty, suspend task until a put occurs
-            await self._event_put.wait()
+            self._getters_waiting += 1
+            try:
+                await self._event_put.wait()
+            finally:
+                self._getters_waiting -= 1
         return self._get()
 
     def get_nowait(self):
@@ -90,7 +125,11 @@ class AsyncQueue:
         """
         while self.full():
             # Queue full, suspend task until a get occurs
-            await self._event_get.wait()
+            self._putters_waiting += 1
+            try:
+                await self._event_get.wait()
+            finally:
+                self._putters_waiting -= 1
         self._put(val)
 
     def put_nowait(self, val) -> bool:
@@ -117,4 +156,4 @@ class AsyncQueue:
 
     def qsize(self) -> int:
         """Return number of items in the queue"""
-        return len(self._queue)
+        return self._count
@@ -4,6 +4,7 @@ Debounces button inputs and invokes any registered callback when button is press
 """
 # Standard imports
 import time
+import micropython
 from machine import Pin, Timer
 from micropython import const
 
@@ -13,30 +14,75 @@ DEF_DEBOUNCE_DURATION_MSEC = const(50)
 
 
 class Button():
+    """Debounced hardware button.
+
+    By default, each edge starts a timer that polls the pin every `debounce_period_msec` and invokes
+    the callback once the button has been released for `debounce_duration_msec`.
+
+    With `edge_only` True, no timer is used. Both edges are handled directly in the IRQ and the
+    callback is invoked on an edge that leaves the pin at the pressed level after the line has been
+    quiet for `debounce_duration_msec`. Bounces, including those on release after a long hold, only
+    ever follow a recent edge and are ignored.
+    """
     def __init__(
         self,
         pin: Pin,
         cb: "Callable[[Pin], None]" = None,
         debounce_period_msec: int = DEF_DEBOUNCE_PERIOD_MSEC,
         debounce_duration_msec: int = DEF_DEBOUNCE_DURATION_MSEC,
-        active_low: bool = True
+        active_low: bool = True,
+        edge_only: bool = False
     ) -> None:
         self._pin = pin
         self._cb = cb
         self.period_msec = debounce_period_msec
         self._active_low = active_low
-        self._check_count = 0
-        self._total_checks = debounce_duration_msec // debounce_period_msec
+        self._deadline_ms = 0
+        self._debounce_duration_msec = debounce_duration_msec
+
+        if edge_only:
+            self._timer = None
+            self._last_edge_ms = time.ticks_add(time.ticks_ms(), -debounce_duration_msec)
+            self._pin.irq(handler=self._edge_handler, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+            return
+
         self._timer = Timer(-1)
-        self._pin.irq(handler=self._button_handler, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+        # Pre-bound methods, IRQ handler must not allocate
+        self._button_handler_cb = self._button_handler
+        self._start_debounce_cb = self._start_debounce
+        self._timer_handler_cb = self._timer_handler
+        self._pin.irq(handler=self._button_handler_cb, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
 
     def _button_handler(self, pin):
-        # Stop interrupts for this pin until debouncing has completed
+        # Stop interrupts for this pin until debouncing has completed. Everything else is deferred
+        # out of IRQ context.
         self._pin.irq(trigger=0)
+        try:
+            micropython.schedule(self._start_debounce_cb, pin)
+        except RuntimeError:
+            # Schedule queue is full, re-arm so the press isn't lost for good
+            self._pin.irq(handler=self._button_handler_cb, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
 
-        # Reset counter and start debounce timer
-        self._check_count = 0
-        self._timer.init(mode=Timer.ONE_SHOT, period=self.period_msec, callback=self._timer_handler)
+    def _edge_handler(self, pin):
+        now = time.ticks_ms()
+        quiet = time.ticks_diff(now, self._last_edge_ms) >= self._debounce_duration_msec
+        self._last_edge_ms = now
+        if not quiet:
+            # Bounce from a recent edge
+            return
+
+        if self._active_low:
+            button_pressed = not self._pin.value()
+        else:
+            button_pressed = self._pin.value()
+
+        if button_pressed and self._cb:
+            self._cb(pin)
+
+    def _start_debounce(self, pin):
+        # Set release deadline and start debounce timer. Runs periodically until debouncing completes.
+        self._deadline_ms = time.ticks_add(time.ticks_ms(), self._debounce_duration_msec)
+        self._timer.init(mode=Timer.PERIODIC, period=self.period_msec, callback=self._timer_handler_cb)
 
     def _timer_handler(self, timer):
         if self._active_low:
@@ -45,22 +91,19 @@ class Button():
             button_pressed = self._pin.value()
 
         if button_pressed:
-            # Button is still pressed, restart timer and counter
-            self._check_count = 0
-            self._timer.init(mode=Timer.ONE_SHOT, period=self.period_msec, callback=self._timer_handler)
+            # Button is still pressed, push out the deadline
+            self._deadline_ms = time.ticks_add(time.ticks_ms(), self._debounce_duration_msec)
             return
 
-        self._check_count += 1
-        if self._check_count >= self._total_checks:
+        if time.ticks_diff(time.ticks_ms(), self._deadline_ms) >= 0:
+            self._timer.deinit()
+
             # Button is debounced, invoke callback if one is registered
             if self._cb:
                 self._cb(self._pin)
 
             # Restart interrupts for this pin
-            self._pin.irq(handler=self._button_handler, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
-        else:
-            # Button has not been released long enough, restart timer
-            self._timer.init(mode=Timer.ONE_SHOT, period=self.period_msec, callback=self._timer_handler)
+            self._pin.irq(handler=self._button_handler_cb, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
 
     def register_cb(self, cb: "Callable[[Pin], None]") -> None:
         """Register a callback function to be called on a button press event.
@@ -16,11 +16,19 @@ class Enum():
 
     @classmethod
     def _cls_vars(cls) -> dict:
-        return {k: v for k, v in cls.__dict__.items() if not callable(v) and not k.startswith("__")}
+        # Enum members can't change, so filter the class dict once per class and cache it.
+        # Checked via cls.__dict__ so subclasses don't pick up a parent's cache.
+        if "_cached_vars" not in cls.__dict__:
+            cls._cached_vars = {
+                k: v for k, v in cls.__dict__.items() if not callable(v) and not k.startswith("__")}
+        return cls._cached_vars
 
     @classmethod
     def contains(cls, value) -> bool:
-        return value in cls._cls_vars().values()
+        if "_value_set" not in cls.__dict__:
+            # Private class vars (e.g. lookup tables) aren't members and may not be hashable
+            cls._value_set = set(v for k, v in cls._cls_vars().items() if not k.startswith("_"))
+        return value in cls._value_set
 
     @classmethod
     def print(cls) -> str:
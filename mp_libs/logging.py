@@ -1,12 +1,10 @@
 """
 logging.py
-
-# TODO: Update BufferHandler to support fixed size buffer
 """
 import io
 import sys
 import time
-from collections import namedtuple
+import micropython
 from machine import RTC
 from micropython import const
 
@@ -29,30 +27,73 @@ _level_dict = {
 }
 
 _loggers = {}
+_root_logger = None  # Cached root logger, avoids the _loggers lookup on every log call
+_handlers_version = 0  # Bumped whenever any logger's handlers change, invalidates emit chains
+_rtc = RTC()
+_needs_time = False  # True if any installed handler's formatter renders asctime or msecs
 _stream = sys.stderr
 # _default_fmt = "%(mono)d %(levelname)s-%(name)s:%(message)s"
 _default_fmt = "%(asctime)s.%(msecs)d %(levelname)s-%(name)s:%(message)s"
 _default_datefmt = "%Y-%m-%d %H:%M:%S"
+_format_fields = ("name", "message", "msecs", "asctime", "levelname", "mono")
+
+
+class LogRecord:
+    __slots__ = ("name", "levelno", "levelname", "message", "dt", "mono", "msecs", "is_time_sync")
 
+    def __init__(self):
+        self.name = None
+        self.levelno = NOTSET
+        self.levelname = None
+        self.message = None
+        self.dt = None
+        self.mono = 0
+        self.msecs = 0
+        self.is_time_sync = False
 
-LogRecord = namedtuple(
-    "LogRecord", ("name", "levelno", "levelname", "message", "dt", "mono", "msecs", "is_time_sync")
-)
 
+# Handlers consume records synchronously within Logger.log, so a single record is reused for every
+# log call rather than allocating a new one each time. Handlers must not hold on to the record.
+# If something logs while the shared record is still being emitted (e.g. from within a handler),
+# that call gets a fresh record instead so the outer call's record isn't overwritten.
+_record = LogRecord()
+_record_in_use = False
 
-def _log_record_factory(name: str, level: int, msg: str) -> LogRecord:
-    if time.time() < _IS_RTC_SET_THRESH:
+
+def _log_record_factory(record: LogRecord, name: str, level: int, msg: str) -> LogRecord:
+    if not _needs_time:
+        # No formatter renders the time, skip reading the clocks
+        is_time_sync = False
+        dt = None
+        msecs = 0
+    elif time.time() < _IS_RTC_SET_THRESH:
         is_time_sync = False
         dt = time.localtime()
         msecs = time.ticks_ms()
     else:
-        rtc = RTC()
-        dt = rtc.datetime()
-        now = rtc.now()
-        msecs = now - ((now // 1_000_000) * 1_000_000)
+        dt = _rtc.datetime()
+        now = _rtc.now()
+        msecs = now % 1_000_000
         is_time_sync = True
 
-    return LogRecord(name, level, _level_dict[level], msg, dt, time.ticks_ms(), msecs, is_time_sync)
+    record.name = name
+    record.levelno = level
+    record.levelname = _level_dict[level]
+    record.message = msg
+    record.dt = dt
+    record.mono = time.ticks_ms()
+    record.msecs = msecs
+    record.is_time_sync = is_time_sync
+
+    return record
+
+
+def _update_needs_time():
+    global _needs_time  # pylint: disable=global-statement
+    _needs_time = any(
+        getattr(h, "formatter", None) is not None and h.formatter._needs_time
+        for lg in _loggers.values() for h in lg.handlers
+    )
 
 
 class Handler:
@@ -71,6 +112,7 @@ class Handler:
 
     def setFormatter(self, formatter):
         self.formatter = formatter
+        _update_needs_time()
 
     def format(self, record):
         return self.formatter.format(record)
@@ -78,6 +120,7 @@ class Handler:
 
 class StreamHandler(Handler):
     def __init__(self, stream=None):
+        super().__init__()
         self.stream = _stream if stream is None else stream
         self.terminator = "\n"
 
@@ -87,7 +130,10 @@ class StreamHandler(Handler):
 
     def emit(self, record):
         if record.levelno >= self.level:
-            self.stream.write(self.format(record) + self.terminator)
+            # Two writes avoid building a concatenated copy of every message
+            write = self.stream.write
+            write(self.format(record))
+            write(self.terminator)
 
 
 class FileHandler(StreamHandler):
@@ -100,12 +146,79 @@ class FileHandler(StreamHandler):
 
 
 class BufferHandler(Handler):
-    def __init__(self, buffer: list = None):
-        self.buffer = buffer if buffer is not None else []
+    """Stores formatted records in a buffer.
+
+    By default records are appended to `buffer`, which grows without bound. If `capacity` is given,
+    records are instead kept in a preallocated ring buffer of that many entries and the oldest
+    record is overwritten once it is full. Use drain() to read records out in either mode.
+    """
+    def __init__(self, buffer: list = None, capacity: int = 0):
+        super().__init__()
+        self.capacity = capacity
+        if capacity > 0:
+            self.buffer = [None] * capacity
+            self._head = 0  # Next index to write
+            self._count = 0
+        else:
+            self.buffer = buffer if buffer is not None else []
+
+    def drain(self):
+        """Yields buffered messages, oldest first, removing them from the buffer."""
+        if self.capacity <= 0:
+            msgs = list(self.buffer)
+            self.buffer.clear()
+            yield from msgs
+            return
+
+        buffer = self.buffer
+        while self._count:
+            index = (self._head - self._count) % self.capacity
+            msg = buffer[index]
+            buffer[index] = None
+            self._count -= 1
+            yield msg
 
     def emit(self, record):
         if record.levelno >= self.level:
-            self.buffer.append(self.format(record))
+            if self.capacity > 0:
+                self.buffer[self._head] = self.format(record)
+                self._head = (self._head + 1) % self.capacity
+                if self._count < self.capacity:
+                    self._count += 1
+            else:
+                self.buffer.append(self.format(record))
+
+
+def _compile_fmt(fmt):
+    """Splits a %-style fmt into its literal text and field names.
+
+    Returns (literals, fields, int_fields) where literals has one more entry than fields, or None if
+    fmt uses anything beyond plain %(field)s / %(field)d specifiers.
+    """
+    literals = []
+    fields = []
+    int_fields = []
+    start = 0
+    while True:
+        index = fmt.find("%", start)
+        if index < 0:
+            literals.append(fmt[start:])
+            break
+
+        end = fmt.find(")", index)
+        if fmt[index + 1:index + 2] != "(" or end < 0 or fmt[end + 1:end + 2] not in ("s", "d"):
+            return None
+
+        field = fmt[index + 2:end]
+        if field not in _format_fields:
+            return None
+
+        literals.append(fmt[start:index])
+        fields.append(field)
+        int_fields.append(fmt[end + 1] == "d")
+        start = end + 2
+
+    return literals, fields, int_fields
 
 
 class Formatter:
@@ -113,21 +226,52 @@ class Formatter:
         self.fmt = _default_fmt if fmt is None else fmt
         self.datefmt = _default_datefmt if datefmt is None else datefmt
 
-    def formatTime(self, datefmt, record):
-        if hasattr(time, "strftime"):
+        # Compile fmt once so format() can skip building a dict and running the % engine per record
+        self._plan = _compile_fmt(self.fmt)
+        self._needs_asctime = "{asctime}" in self.fmt or "%(asctime)s" in self.fmt
+        self._needs_time = self._needs_asctime or "{msecs}" in self.fmt or "%(msecs)" in self.fmt
+
+        # The default fmt is by far the most common, format() uses a hand-specialized version for it
+        self._is_default_fmt = self.fmt == _default_fmt
+
+    # strftime support is fixed per port, pick the implementation once when the class is created
+    if hasattr(time, "strftime"):
+        def formatTime(self, datefmt, record):
             return time.strftime(datefmt, time.localtime(record.dt))
+    else:
+        def formatTime(self, datefmt, record):
+            dt = record.dt
+            if record.is_time_sync:
+                # RTC.datetime() tuples have weekday at index 3
+                return f"{dt[0]}-{dt[1]:02d}-{dt[2]:02d} {dt[4]:02d}:{dt[5]:02d}:{dt[6]:02d}"
 
-        if record.is_time_sync:
-            return f"{record.dt[0]}-{record.dt[1]:02d}-{record.dt[2]:02d} {record.dt[4]:02d}:{record.dt[5]:02d}:{record.dt[6]:02d}"
+            return f"{dt[0]}-{dt[1]:02d}-{dt[2]:02d} {dt[3]:02d}:{dt[4]:02d}:{dt[5]:02d}"
 
-        return f"{record.dt[0]}-{record.dt[1]:02d}-{record.dt[2]:02d} {record.dt[3]:02d}:{record.dt[4]:02d}:{record.dt[5]:02d}"
+    def _format_default(self, record):
+        return (
+            self.formatTime(self.datefmt, record) + "." + str(record.msecs) + " " +
+            record.levelname + "-" + record.name + ":" + record.message
+        )
 
     def format(self, record):
-        if "{asctime}" in self.fmt or "%(asctime)s" in self.fmt:
+        if self._is_default_fmt:
+            return self._format_default(record)
+
+        if self._needs_asctime:
             asctime = self.formatTime(self.datefmt, record)
         else:
             asctime = ""
 
+        plan = self._plan
+        if plan is not None:
+            literals, fields, int_fields = plan
+            pieces = [literals[0]]
+            for i, field in enumerate(fields):
+                value = asctime if field == "asctime" else getattr(record, field)
+                pieces.append(str(int(value)) if int_fields[i] else str(value))
+                pieces.append(literals[i + 1])
+            return "".join(pieces)
+
         return self.fmt % {
             "name": record.name,
             "message": record.message,
@@ -143,46 +287,94 @@ class Logger:
         self.name = name
         self.level = level
         self.handlers = []
+        self._emit_chain = ()
+        self._chain_version = -1
+        self._update_effective_level()
+
+    def _build_emit_chain(self):
+        # Root's handlers are called first, then this logger's own. The root logger's own handlers are
+        # its root handlers, so they are only included once.
+        root = _root_logger
+        chain = [h.emit for h in root.handlers]
+        if self is not root:
+            chain.extend(h.emit for h in self.handlers)
+        self._emit_chain = tuple(chain)
+        self._chain_version = _handlers_version
+
+    def _update_effective_level(self):
+        # Cached so the level methods can reject disabled records with a single compare
+        root = _root_logger
+        self._effective_level = self.level or (root.level if root else NOTSET) or _DEFAULT_LEVEL
 
     def setLevel(self, level):
         self.level = level
+        if self.name == "root":
+            # Every logger without its own level falls back on root's
+            for logger in _loggers.values():
+                logger._update_effective_level()
+        else:
+            self._update_effective_level()
 
     def isEnabledFor(self, level):
-        return level >= self.getEffectiveLevel()
+        return level >= self._effective_level
 
     def getEffectiveLevel(self):
-        return self.level or getLogger().level or _DEFAULT_LEVEL
+        return self._effective_level
 
     def log(self, level, msg, *args):
+        global _record_in_use  # pylint: disable=global-statement
         if self.isEnabledFor(level):
             if args:
-                if isinstance(args[0], dict):
-                    args = args[0]
-                msg = msg % args
-            record = _log_record_factory(self.name, level, msg)
-
-            # Call any root handlers
-            for h in getLogger().handlers:
-                h.emit(record)
-
-            # Call any local handlers
-            for h in self.handlers:
-                h.emit(record)
-
+                # Positional args are the common case, only check for a mapping arg if they fail
+                try:
+                    msg = msg % args
+                except TypeError:
+                    if len(args) != 1 or not isinstance(args[0], dict):
+                        raise
+                    msg = msg % args[0]
+            if self._chain_version != _handlers_version:
+                self._build_emit_chain()
+
+            if _record_in_use:
+                record = LogRecord()
+            else:
+                record = _record
+                _record_in_use = True
+
+            try:
+                _log_record_factory(record, self.name, level, msg)
+
+                # Call any root handlers and then any local handlers
+                for emit in self._emit_chain:
+                    emit(record)
+            finally:
+                if record is _record:
+                    _record_in_use = False
+
+    @micropython.native
     def debug(self, msg, *args):
-        self.log(DEBUG, msg, *args)
+        if DEBUG >= self._effective_level:
+            self.log(DEBUG, msg, *args)
 
+    @micropython.native
     def info(self, msg, *args):
-        self.log(INFO, msg, *args)
+        if INFO >= self._effective_level:
+            self.log(INFO, msg, *args)
 
+    @micropython.native
     def warning(self, msg, *args):
-        self.log(WARNING, msg, *args)
+        if WARNING >= self._effective_level:
+            self.log(WARNING, msg, *args)
 
+    @micropython.native
     def error(self, msg, *args):
-        self.log(ERROR, msg, *args)
+        if ERROR >= self._effective_level:
+            self.log(ERROR, msg, *args)
 
+    @micropython.native
     def critical(self, msg, *args):
-        self.log(CRITICAL, msg, *args)
+        if CRITICAL >= self._effective_level:
+            self.log(CRITICAL, msg, *args)
 
     def exception(self, msg, *args, exc_info=True):
         self.log(ERROR, msg, *args)
@@ -197,48 +389,60 @@ class Logger:
             self.log(ERROR, buf.getvalue())
 
     def addHandler(self, handler):
+        global _handlers_version  # pylint: disable=global-statement
         self.handlers.append(handler)
+        _handlers_version += 1
+        _update_needs_time()
+
+    def removeHandler(self, handler):
+        global _handlers_version  # pylint: disable=global-statement
+        if handler in self.handlers:
+            self.handlers.remove(handler)
+            _handlers_version += 1
+            _update_needs_time()
 
     def hasHandlers(self):
         return len(self.handlers) > 0
 
 
 def getLogger(name=None):
+    global _root_logger  # pylint: disable=global-statement
     if name is None:
         name = "root"
     if name not in _loggers:
         _loggers[name] = Logger(name)
         if name == "root":
+            _root_logger = _loggers[name]
             basicConfig()
     return _loggers[name]
 
 
 def log(level, msg, *args):
-    getLogger().log(level, msg, *args)
+    _root_logger.log(level, msg, *args)
 
 
 def debug(msg, *args):
-    getLogger().debug(msg, *args)
+    _root_logger.debug(msg, *args)
 
 
 def info(msg, *args):
-    getLogger().info(msg, *args)
+    _root_logger.info(msg, *args)
 
 
 def warning(msg, *args):
-    getLogger().warning(msg, *args)
+    _root_logger.warning(msg, *args)
 
 
 def error(msg, *args):
-    getLogger().error(msg, *args)
+    _root_logger.error(msg, *args)
 
 
 def critical(msg, *args):
-    getLogger().critical(msg, *args)
+    _root_logger.critical(msg, *args)
 
 
 def exception(msg, *args):
-    getLogger().exception(msg, *args)
+    _root_logger.exception(msg, *args)
 
 
 def shutdown():
@@ -262,15 +466,17 @@ def basicConfig(
     encoding="UTF-8",
     force=False,
 ):
+    global _root_logger, _handlers_version  # pylint: disable=global-statement
     if "root" not in _loggers:
         _loggers["root"] = Logger("root")
 
-    logger = _loggers["root"]
+    logger = _root_logger = _loggers["root"]
 
     if force or not logger.handlers:
         for h in logger.handlers:
             h.close()
         logger.handlers = []
+        _handlers_version += 1
 
         if filename is None:
             handler = StreamHandler(stream)
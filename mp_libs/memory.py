@@ -1,12 +1,9 @@
-"""Memory Support Library
-
-TODO: Update rtc memory to support slicing
-"""
+"""Memory Support Library"""
 # pylint: disable=c-extension-no-member
 # pyright: reportGeneralTypeIssues=false
 # Standard imports
 import struct
-from collections import OrderedDict
+import micropython
 from machine import RTC
 from micropython import const
 try:
@@ -29,21 +26,28 @@ FREE_INDEX_OFFSET = const(4)
 NUM_ELEMS_OFFSET = const(6)
 ELEMENTS_OFFSET = const(8)
 MAGIC_NUM = const(0xFEEDFACE)
+MAGIC_NUM_BYTES = b"\xfe\xed\xfa\xce"  # MAGIC_NUM as stored in rtc memory
 ELEMENT_BYTE_ORDER = ">"
-ELEMENT_FORMAT = "BBs%ds%s"  # name_len, data_len, data_type, name, data type str
-ELEMENT_FORMAT_STR = ELEMENT_BYTE_ORDER + ELEMENT_FORMAT
 ELEMENT_NAME_LEN_OFFSET = const(0)
 ELEMENT_DATA_LEN_OFFSET = const(1)
 ELEMENT_DATA_TYPE_OFFSET = const(2)
 ELEMENT_NAME_OFFSET = const(3)
 ELEMENT_MAX_DATA_LEN = const(255)
 ELEMENT_MAX_NAME_LEN = const(255)
+HEADER_BYTE_ORDER = "big"
+ELEMENT_TYPE_FORMATS = {int: "i", float: "f", str: "s", bool: "B"}  # Python type to struct format char
 
 # Globals
 logger = logging.getLogger("memory")
 logger.setLevel(config["logging_level"])
 
 
+@micropython.viper
+def _read_header(buf: ptr8, offset: int) -> int:  # pylint: disable=undefined-variable
+    """Returns an element's name_len, data_len, and data_type bytes packed into a single int."""
+    return (buf[offset] << 16) | (buf[offset + 1] << 8) | buf[offset + 2]
+
+
 class BackupRAM():
     """Backup RAM Abstraction
 
@@ -76,7 +80,14 @@ class BackupRAM():
       * Element data type - single char indicating how data is formatted
       * Element name - string of length 'name length'
       * Element data - of type 'data type' and of size 'data length'
+
+    The instance's region of RTC memory is shadowed in a RAM bytearray that is loaded once at init.
+    All reads are served from the shadow and writes go to both the shadow and RTC memory, so only
+    one BackupRAM instance should be used per region.
     """
+    __slots__ = (
+        "offset", "size", "rtc", "_mem", "_shadow", "_end_byte", "_free_index", "_num_elems", "_elements_lut")
+
     def __init__(self, offset: int = 0, size: Optional[int] = None, reset: bool = False) -> None:
         if size is not None and size <= ELEMENTS_OFFSET:
             raise MemoryError(f"Given size ({size}) is too small. Must be greater than {ELEMENTS_OFFSET}.")
@@ -88,131 +99,153 @@ class BackupRAM():
         self.size = size
         self.rtc = RTC()
 
-        valid_magic = self._check_magic_num()
-        if not valid_magic:
-            logger.warning("Invalid magic number. Corrupted backup ram.")
+        # Not every port exposes rtc memory as a buffer. Check once and fall back to per-byte
+        # indexing if slicing isn't supported.
+        try:
+            self._mem = memoryview(self.rtc)
+        except TypeError:
+            self._mem = None
+
+        # Load the shadow copy of this instance's region of rtc memory. The region's end is kept to
+        # bound element writes.
+        end_byte = self._end_byte = RTC.MEM_SIZE if size is None else min(offset + size, RTC.MEM_SIZE)
+        if self._mem is not None:
+            self._shadow = bytearray(self._mem[offset:end_byte])
+        else:
+            # rtc memory doesn't support slicing, so have to iterate
+            self._shadow = bytearray(end_byte - offset)
+            for i in range(offset, end_byte):
+                self._shadow[i - offset] = self.rtc[i]
 
-        if reset or not valid_magic:
+        # No need to validate contents that are about to be reset anyway
+        if reset:
+            self.reset()
+        elif not self._check_magic_num():
+            logger.warning("Invalid magic number. Corrupted backup ram.")
             self.reset()
 
-        # Initialize meta data
-        free_index = self._get_free_index()
-        num_elements = self._get_num_elems()
-        if free_index < self.offset + ELEMENTS_OFFSET:
-            self._set_free_index(self.offset + ELEMENTS_OFFSET)
-
-        logger.debug(f"free_index: {free_index}")
-        logger.debug(f"num_elements: {num_elements}")
-
-        # Build up element name to RTC_memory index lookup table. Uses extra memory to speed up
-        # add, get, and set element API.
-        self._elements_lut = OrderedDict()
-        index = self.offset + ELEMENTS_OFFSET
-        for _ in range(num_elements):
-            name = self._element_get_name(index)
-            size = self._element_get_size(index)
-            self._elements_lut[name] = index
-            index += size
+        # Initialize meta data. Mirrored in RAM since this instance is the only writer.
+        self._free_index = self._get_free_index()
+        self._num_elems = self._get_num_elems()
+        if self._free_index < self.offset + ELEMENTS_OFFSET:
+            self._set_meta_data(self.offset + ELEMENTS_OFFSET, self._num_elems)
+
+        logger.debug(f"free_index: {self._free_index}")
+        logger.debug(f"num_elements: {self._num_elems}")
+
+        # Build up element name lookup table by walking the elements in the shadow. Uses extra memory
+        # to speed up add, get, and set element API. Each entry caches the element's parsed header:
+        # (start_byte, data_offset, data_len, data_fmt)
+        lut = self._elements_lut = {}
+        read_header = _read_header
+        byte_order = ELEMENT_BYTE_ORDER
+        base = self.offset
+        blob = self._shadow
+        index = ELEMENTS_OFFSET
+        for _ in range(self._num_elems):
+            header = read_header(blob, index)
+            name_len = header >> 16
+            data_len = (header >> 8) & 0xFF
+            data_type = chr(header & 0xFF)
+            name_offset = index + ELEMENT_NAME_OFFSET
+            data_offset = name_offset + name_len
+
+            if data_type == "s":
+                data_type = f"{data_len}s"
+
+            lut[bytes(blob[name_offset:data_offset]).decode()] = (
+                base + index, base + data_offset, data_len, byte_order + data_type)
+            index = data_offset + data_len
 
     def _check_magic_num(self) -> bool:
-        return self._get_magic() == MAGIC_NUM
-
-    def _element_get_data(self, start_byte: int):
-        name_len = self._element_get_name_length(start_byte)
-        data_len = self._element_get_data_len(start_byte)
-        data_type = self._element_get_data_type(start_byte)
-        offset = start_byte +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_NAME_LEN_OFFSET]) +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_DATA_LEN_OFFSET]) +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_DATA_TYPE_OFFSET]) +\
-            name_len
-        byte_data = bytearray()
-
-        for i in range(data_len):
-            byte_data.append(self.rtc[offset + i])
+        return self._shadow[MAGIC_NUM_OFFSET:MAGIC_NUM_OFFSET + 4] == MAGIC_NUM_BYTES
 
-        if data_type == "s":
-            data_type = f"{data_len}s"
+    @micropython.native
+    def _element_get_data(self, data_offset: int, data_fmt: str):
+        result = struct.unpack_from(data_fmt, self._shadow, data_offset - self.offset)[0]
 
-        result = struct.unpack(f">{data_type}", byte_data)[0]
-
-        if "s" in data_type:
+        if data_fmt[-1] == "s":
             result = result.decode("utf-8")
 
         return result
 
-    def _element_get_data_len(self, start_byte: int) -> int:
-        byte_data = bytearray([self.rtc[start_byte + ELEMENT_DATA_LEN_OFFSET]])
-        return struct.unpack_from(">B", byte_data, 0)[0]
-
-    def _element_get_data_type(self, start_byte: int) -> str:
-        byte_data = bytearray([self.rtc[start_byte + ELEMENT_DATA_TYPE_OFFSET]])
-        return struct.unpack_from(">s", byte_data, 0)[0].decode()
-
-    def _element_get_name(self, start_byte: int) -> str:
-        name_len = self._element_get_name_length(start_byte)
-        offset = start_byte +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_NAME_LEN_OFFSET]) +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_DATA_LEN_OFFSET]) +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_DATA_TYPE_OFFSET])
-        byte_data = bytearray()
-
-        for i in range(name_len):
-            byte_data.append(self.rtc[offset + i])
-
-        return struct.unpack(f">{name_len}s", byte_data)[0].decode()
-
-    def _element_get_name_length(self, start_byte: int) -> int:
-        byte_data = bytearray([self.rtc[start_byte + ELEMENT_NAME_LEN_OFFSET]])
-        return struct.unpack_from(">B", byte_data, 0)[0]
-
-    def _element_get_size(self, start_byte: int) -> int:
-        name_len = self._element_get_name_length(start_byte)
-        data_len = self._element_get_data_len(start_byte)
-        size = struct.calcsize(ELEMENT_FORMAT[ELEMENT_NAME_LEN_OFFSET]) +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_DATA_LEN_OFFSET]) +\
-            struct.calcsize(ELEMENT_FORMAT[ELEMENT_DATA_TYPE_OFFSET]) +\
-            name_len +\
-            data_len
-        return size
-
     def _get_free_index(self) -> int:
-        return self._get_rtc_memory_data(self.offset + FREE_INDEX_OFFSET, self.offset + FREE_INDEX_OFFSET + 2, "H")
+        return self._get_rtc_memory_data(self.offset + FREE_INDEX_OFFSET, self.offset + FREE_INDEX_OFFSET + 2)
 
     def _get_magic(self) -> int:
-        return self._get_rtc_memory_data(self.offset + MAGIC_NUM_OFFSET, self.offset + MAGIC_NUM_OFFSET + 4, "I")
+        return self._get_rtc_memory_data(self.offset + MAGIC_NUM_OFFSET, self.offset + MAGIC_NUM_OFFSET + 4)
 
     def _get_num_elems(self) -> int:
-        return self._get_rtc_memory_data(self.offset + NUM_ELEMS_OFFSET, self.offset + NUM_ELEMS_OFFSET + 2, "H")
+        return self._get_rtc_memory_data(self.offset + NUM_ELEMS_OFFSET, self.offset + NUM_ELEMS_OFFSET + 2)
 
-    def _get_rtc_memory_data(self, start_byte: int, end_byte: int, data_type: str):
-        # rtc memory doesn't support slicing, so have to iterate
-        byte_data = bytearray()
-        for i in range(start_byte, end_byte):
-            byte_data.append(self.rtc[i])
+    def _get_rtc_memory_data(self, start_byte: int, end_byte: int) -> int:
+        return int.from_bytes(self._rtc_read(start_byte, end_byte), HEADER_BYTE_ORDER)
 
-        return struct.unpack(f">{data_type}", byte_data)[0]
+    def _set_magic(self) -> None:
+        self._set_rtc_memory_data(self.offset + MAGIC_NUM_OFFSET, self.offset + MAGIC_NUM_OFFSET + 4, MAGIC_NUM)
+
+    def _set_meta_data(self, free_index: int, num_elems: int) -> None:
+        # Free index and num elems are adjacent in memory, update both with a single write
+        self._free_index = free_index
+        self._num_elems = num_elems
+        self._set_rtc_memory_data(
+            self.offset + FREE_INDEX_OFFSET, self.offset + NUM_ELEMS_OFFSET + 2, (free_index << 16) | num_elems)
+
+    def _overrun_msg(self, index: int, element_len: int) -> str:
+        if self.size and (index + element_len > self.offset + self.size):
+            return (
+                "Attempted to write beyond size of backup ram instance\n" +
+                f"Offset: {self.offset}, " +
+                f"Max size: {self.size} bytes, " +
+                f"Overran by: {(index + element_len - (self.offset + self.size))} bytes"
+            )
 
-    def _set_free_index(self, value) -> None:
-        self._set_rtc_memory_data(self.offset + FREE_INDEX_OFFSET, "H", value)
+        return (
+            "Attempted to write beyond the max size of rtc.memory\n" +
+            f"Offset: {self.offset}, " +
+            f"Max size: {RTC.MEM_SIZE}, " +
+            f"Overran by: {(index + element_len - RTC.MEM_SIZE)}"
+        )
 
-    def _set_magic(self) -> None:
-        self._set_rtc_memory_data(self.offset + MAGIC_NUM_OFFSET, "I", MAGIC_NUM)
+    def _rtc_flush(self, start_byte: int, length: int) -> None:
+        """Write the shadow's bytes in [start_byte, start_byte + length) through to rtc memory."""
+        shadow_start = start_byte - self.offset
+        if self._mem is not None:
+            self._mem[start_byte:start_byte + length] = memoryview(self._shadow)[shadow_start:shadow_start + length]
+            return
+
+        # rtc memory doesn't support slicing, so have to iterate
+        rtc = self.rtc
+        shadow = self._shadow
+        for i in range(length):
+            rtc[start_byte + i] = shadow[shadow_start + i]
 
-    def _set_num_elems(self, value) -> None:
-        self._set_rtc_memory_data(self.offset + NUM_ELEMS_OFFSET, "H", value)
+    def _rtc_read(self, start_byte: int, end_byte: int) -> bytes:
+        return bytes(self._shadow[start_byte - self.offset:end_byte - self.offset])
 
-    def _set_rtc_memory_data(self, start_byte: int, data_type: str, data) -> None:
-        byte_data = struct.pack(f">{data_type}", data)
-        for i, byte in enumerate(byte_data):
-            self.rtc[start_byte + i] = byte
+    def _rtc_write(self, start_byte: int, data) -> None:
+        shadow_start = start_byte - self.offset
+        self._shadow[shadow_start:shadow_start + len(data)] = data
+        self._rtc_flush(start_byte, len(data))
+
+    def _set_rtc_memory_data(self, start_byte: int, end_byte: int, data: int) -> None:
+        self._rtc_write(start_byte, data.to_bytes(end_byte - start_byte, HEADER_BYTE_ORDER))
 
     @staticmethod
     def reset_rtc() -> None:
-        """Reset all of rtc memory"""
+        """Reset all of rtc memory.
+
+        This bypasses any existing BackupRAM, BackupList, or BackupDict instances. Their RAM shadows
+        and lookup tables still hold the old contents and their next write would put stale data back
+        into rtc memory. Discard those instances, or call reset() on them, after calling this.
+        """
         rtc = RTC()
-        for i in range(len(rtc)):  # pylint: disable=consider-using-enumerate
-            rtc[i] = 0
+        try:
+            memoryview(rtc)[:] = bytes(len(rtc))
+        except TypeError:
+            # rtc memory doesn't support slicing, so have to iterate
+            for i in range(len(rtc)):  # pylint: disable=consider-using-enumerate
+                rtc[i] = 0
 
     def add_element(self, name: str, data_type: str, data, clear_if_full: bool = False) -> None:
         """Adds a new name/data element to backup RAM.
@@ -224,7 +257,7 @@ class BackupRAM():
             clear_if_full (bool): Clear memory if not enough room for new element.
         """
         # Handle string data type
-        if "s" in data_type:
+        if data_type[-1] == "s":
             if len(data) > ELEMENT_MAX_DATA_LEN:
                 data = data[0:ELEMENT_MAX_DATA_LEN]
             data = data.encode()
@@ -232,64 +265,53 @@ class BackupRAM():
             data_type_fmt = f"{len(data)}s"
         else:
             data_type_fmt = data_type
+        data_fmt = ELEMENT_BYTE_ORDER + data_type_fmt
+        data_len = struct.calcsize(data_fmt)
+        if data_len > ELEMENT_MAX_DATA_LEN:
+            raise ValueError(f"Element data is too large ({data_len} bytes). Max is {ELEMENT_MAX_DATA_LEN} bytes.")
 
         # Ensure name isn't too long
         if len(name) > ELEMENT_MAX_NAME_LEN:
             name = name[0:ELEMENT_MAX_NAME_LEN]
-
-        # Pack up the element: name_len, data_len, data_type, name, data
-        packed_data = struct.pack(
-            ELEMENT_FORMAT_STR % (len(name), data_type_fmt),
-            len(name),
-            struct.calcsize(data_type_fmt),
-            data_type.encode(),
-            name.encode(),
-            data
-        )
+        name_bytes = name.encode()
+        name_len = len(name_bytes)
+        data_offset = ELEMENT_NAME_OFFSET + name_len
+
+        # Pack up the whole element before anything is written, so a bad value can't leave a partial
+        # element behind: name_len, data_len, data_type, name, data
+        # Header bytes are written directly so only the data needs struct, using its cached format.
+        packed_data = bytearray(data_offset + data_len)
+        packed_data[ELEMENT_NAME_LEN_OFFSET] = name_len
+        packed_data[ELEMENT_DATA_LEN_OFFSET] = data_len
+        packed_data[ELEMENT_DATA_TYPE_OFFSET] = ord(data_type)
+        packed_data[ELEMENT_NAME_OFFSET:data_offset] = name_bytes
+        struct.pack_into(data_fmt, packed_data, data_offset, data)
 
         # Make sure there is enough room for the new element
-        index = self._get_free_index()
-        if self.size and (index + len(packed_data) > self.offset + self.size):
-            msg = (
-                "Attempted to write beyond size of backup ram instance\n" +
-                f"Offset: {self.offset}, " +
-                f"Max size: {self.size} bytes, " +
-                f"Overran by: {(index + len(packed_data) - (self.offset + self.size))} bytes"
-            )
-
-            if clear_if_full:
-                self.reset(clear=True, verbose=False)
-                logger.warning(msg)
-                logger.warning("Cleared memory")
-                index = self._get_free_index()
-            else:
+        index = self._free_index
+        element_len = len(packed_data)
+        if index + element_len > self._end_byte:
+            msg = self._overrun_msg(index, element_len)
+            if not clear_if_full:
                 raise MemoryError(msg)
-        if index + len(packed_data) > self.rtc.MEM_SIZE:
-            msg = (
-                "Attempted to write beyond the max size of rtc.memory\n" +
-                f"Offset: {self.offset}, " +
-                f"Max size: {self.rtc.MEM_SIZE}, " +
-                f"Overran by: {(index + len(packed_data) - self.rtc.MEM_SIZE)}"
-            )
 
-            if clear_if_full:
-                self.reset(clear=True, verbose=False)
-                logger.warning(msg)
-                logger.warning("Cleared memory")
-                index = self._get_free_index()
-            else:
-                raise MemoryError(msg)
+            self.reset(verbose=False)
+            logger.warning(msg)
+            logger.warning("Cleared memory")
+
+            # Element may not even fit in an empty region
+            index = self._free_index
+            if index + element_len > self._end_byte:
+                raise MemoryError(self._overrun_msg(index, element_len))
 
-        # Append element to next available index in rtc bytearray
-        self._elements_lut[name] = index
-        for byte in packed_data:
-            self.rtc[index] = byte
-            index += 1
+        # Append element to next available index in rtc memory
+        self._rtc_write(index, packed_data)
+        self._elements_lut[name] = (index, index + data_offset, data_len, data_fmt)
 
         # Update free index and num elements
-        self._set_free_index(index)
-        self._set_num_elems(self._get_num_elems() + 1)
+        self._set_meta_data(index + element_len, self._num_elems + 1)
 
+    @micropython.native
     def get_element(self, name: str):
         """Return the element's data from backup RAM.
 
@@ -299,7 +321,8 @@ class BackupRAM():
         Returns:
             Element data
         """
-        return self._element_get_data(self._elements_lut[name])
+        _, data_offset, _, data_fmt = self._elements_lut[name]
+        return self._element_get_data(data_offset, data_fmt)
 
     def print_elements(self) -> None:
         """Print contents of backup RAM."""
@@ -314,23 +337,26 @@ class BackupRAM():
             print(f"{name}: {self.get_element(name)}")
 
     def reset(self, clear: bool = False, verbose: bool = True):
-        """Reset backup RAM. All existing data will be lost."""
+        """Reset backup RAM. All existing data will be lost.
+
+        Resetting the meta data alone makes all elements unreachable, so stale bytes are left in place
+        unless `clear` is True.
+
+        Args:
+            clear (bool): Also zero the bytes of all existing elements.
+            verbose (bool): Log a warning when resetting.
+        """
         if verbose:
             logger.warning(f"Resetting nvram memory at offset: {self.offset}...")
 
         if clear:
-            index = self.offset + ELEMENTS_OFFSET
-            for _ in range(self._get_num_elems()):
-                size = self._element_get_size(index)
-                index += size
-
-            for i in range(self.offset + ELEMENTS_OFFSET, index):
-                self.rtc[i] = 0
+            # Elements are stored contiguously, everything up to the free index is in use
+            start = self.offset + ELEMENTS_OFFSET
+            self._rtc_write(start, bytes(self._free_index - start))
 
         self._set_magic()
-        self._set_free_index(self.offset + ELEMENTS_OFFSET)
-        self._set_num_elems(0)
-        self._elements_lut = OrderedDict()
+        self._set_meta_data(self.offset + ELEMENTS_OFFSET, 0)
+        self._elements_lut = {}
 
     def set_element(self, name: str, data):
         """Write the element's data to backup RAM.
@@ -339,11 +365,10 @@ class BackupRAM():
             name (str): Name of element to update.
             data : Data to set. Must be of type defined when element was added.
         """
-        start_byte = self._elements_lut[name]
-        data_type = self._element_get_data_type(start_byte)
+        _, data_offset, data_len, data_fmt = self._elements_lut[name]
 
-        if "s" in data_type:
-            data_len = self._element_get_data_len(start_byte)
+        if data_fmt[-1] == "s":
+            data = data.encode()
             if len(data) != data_len:
                 msg = (
                     "String data length must match that of original string\n" +
@@ -352,25 +377,9 @@ class BackupRAM():
                 )
                 raise RuntimeError(msg)
 
-            data = data.encode()
-            data_type = "s"
-            data_type_fmt = f"{len(data)}s"
-        else:
-            data_type_fmt = data_type
-
-        # Rebuild packed struct w/ new data
-        packed_data = struct.pack(
-            ELEMENT_FORMAT_STR % (len(name), data_type_fmt),
-            len(name),
-            struct.calcsize(data_type_fmt),
-            data_type.encode(),
-            name.encode(),
-            data
-        )
-
-        # Update element in memory
-        for i, byte in enumerate(packed_data):
-            self.rtc[start_byte + i] = byte
+        # Header and name never change, only the data needs to be re-written. Pack it first so a bad
+        # value fails before anything is written.
+        self._rtc_write(data_offset, struct.pack(data_fmt, data))
 
 
 class BackupList(BackupRAM):
@@ -378,6 +387,8 @@ class BackupList(BackupRAM):
 
     NOTE: Don't use logger in this class since BackupList can be used as a logger handler
     """
+    __slots__ = ("clear_if_full",)
+
     def __init__(
         self,
         offset: int = 0,
@@ -399,8 +410,8 @@ class BackupList(BackupRAM):
         return self.get_element(name)
 
     def __iter__(self):
-        for name in self._elements_lut:
-            yield self.get_element(name)
+        for _, data_offset, _, data_fmt in self._elements_lut.values():
+            yield self._element_get_data(data_offset, data_fmt)
 
     def __len__(self):
         return len(self._elements_lut)
@@ -410,11 +421,12 @@ class BackupList(BackupRAM):
         if name not in self._elements_lut:
             raise IndexError(f"Invalid index: {index}")
 
-        data_type = self._element_get_data_type(self._elements_lut[name])
-        if isinstance(value, int) and data_type != "i":
-            raise TypeError(f"Can't change element type. Attempted to change type from '{data_type}' to 'i'")
-        if isinstance(value, str) and data_type != "s":
-            raise TypeError(f"Can't change element type. Attempted to change type from '{data_type}' to 's'")
+        data_type = self._elements_lut[name][3][-1]
+        fmt_char = ELEMENT_TYPE_FORMATS.get(type(value), None)
+        if fmt_char is None:
+            raise TypeError(f"Unsupported value type for {value}: {type(value)}")
+        if fmt_char != data_type:
+            raise TypeError(f"Can't change element type. Attempted to change type from '{data_type}' to '{fmt_char}'")
 
         self.set_element(name, value)
 
@@ -433,18 +445,11 @@ class BackupList(BackupRAM):
             TypeError: Unsupported value type.
             MemoryError: BackupRAM is too full to append a new value.
         """
-        if isinstance(value, int):
-            fmt_char = "i"
-        elif isinstance(value, str):
-            fmt_char = "s"
-        elif isinstance(value, float):
-            fmt_char = "f"
-        elif isinstance(value, bool):
-            fmt_char = "B"
-        else:
+        fmt_char = ELEMENT_TYPE_FORMATS.get(type(value), None)
+        if fmt_char is None:
             raise TypeError(f"Unsupported value type for {value}: {type(value)}")
 
-        index = self._get_num_elems()
+        index = self._num_elems
         try:
             self.add_element(f"{index}", fmt_char, value)
         except MemoryError as exc:
@@ -463,15 +468,14 @@ class BackupList(BackupRAM):
         Returns:
             list: Newly copied list.
         """
-        new_list = []
-        for name in self._elements_lut.keys():
-            new_list.append(self.get_element(name))
-
-        return new_list
+        element_get_data = self._element_get_data
+        return [element_get_data(data_offset, data_fmt) for _, data_offset, _, data_fmt in self._elements_lut.values()]
 
 
 class BackupDict(BackupRAM):
     """Dict data structure that uses BackupRAM as its backing data store."""
+    __slots__ = ()
+
     def __init__(self, offset: int = 0, size: Optional[int] = None, reset: bool = False) -> None:
         super().__init__(offset, size, reset)
 
@@ -488,7 +492,7 @@ class BackupDict(BackupRAM):
         return self.get_element(key)
 
     def __iter__(self):
-        for key in self._elements_lut.keys():
+        for key in self._elements_lut:
             value = self.get_element(key)
             yield key, value
 
@@ -499,15 +503,8 @@ class BackupDict(BackupRAM):
         if key in self._elements_lut:
             self.set_element(key, value)
         else:
-            if isinstance(value, int):
-                data_type = "i"
-            elif isinstance(value, float):
-                data_type = "f"
-            elif isinstance(value, str):
-                data_type = "s"
-            elif isinstance(value, bool):
-                data_type = "B"
-            else:
+            data_type = ELEMENT_TYPE_FORMATS.get(type(value), None)
+            if data_type is None:
                 raise TypeError(f"Unsupported type for value: {value}")
 
             self.add_element(key, data_type, value)
@@ -8,6 +8,8 @@ TODO: Figure out how to do a fixture (if it's even possible on micropython)
 
 class raises:  # pylint: disable=invalid-name
     """Asserts that the specified exception is thrown while in this context."""
+    __slots__ = ("exc",)
+
     def __init__(self, exc) -> None:
         self.exc = exc
 
@@ -31,24 +33,25 @@ def parametrize(arg_names, arg_values):
     if isinstance(arg_names, str):
         arg_names = [name.strip() for name in arg_names.split(",")]
 
+    # Build the keyword arguments for each set of values once, at decoration time
+    params_list = []
+    for value in arg_values:
+        # Ensure `value` is a tuple
+        if not isinstance(value, tuple):
+            value = (value,)
+
+        # Check if the length of `value` matches `arg_names`
+        if len(value) != len(arg_names):
+            raise ValueError(
+                f"Value length {len(value)} does not match argument names length {len(arg_names)}"
+            )
+
+        params_list.append(dict(zip(arg_names, value)))
+
     def decorator(func):
         def wrapper(*args):
-            # Loop through all sets of argument values
-            for value in arg_values:
-                # Ensure `value` is a tuple
-                if not isinstance(value, tuple):
-                    value = (value,)
-
-                # Check if the length of `value` matches `arg_names`
-                if len(value) != len(arg_names):
-                    raise ValueError(
-                        f"Value length {len(value)} does not match argument names length {len(arg_names)}"
-                    )
-
-                # Create keyword arguments from argument names and values
-                params = dict(zip(arg_names, value))
-
-                # Call the decorated function with the parameters
+            # Call the decorated function with each set of parameters
+            for params in params_list:
                 func(*args, **params)
         return wrapper
     return decorator
@@ -34,6 +34,7 @@ from secrets import secrets
 # Constants
 DEFAULT_MTU_SIZE_BYTES = const(250)
 TZ_OFFSET_PACIFIC = const(-8)
+DEVICE_ID = binascii.hexlify(machine.unique_id()).decode("utf-8")  # Invariant, compute once
 
 # Globals
 logger = logging.getLogger("network")
@@ -101,7 +102,7 @@ class Network(InterfaceProtocol):
         Returns:
             Network: Network instance.
         """
-        client_id = id_prefix + binascii.hexlify(machine.unique_id()).decode("utf-8")
+        client_id = id_prefix + DEVICE_ID
         espnow_protocol = EspnowProtocol(config["epn_peer_mac"], hostname=client_id, channel=config["epn_channel"])
 
         return cls(espnow_protocol)
@@ -118,7 +119,7 @@ class Network(InterfaceProtocol):
         Returns:
             Network: Network instance.
         """
-        client_id = id_prefix + binascii.hexlify(machine.unique_id()).decode("utf-8")
+        client_id = id_prefix + DEVICE_ID
         espnow_protocol = EspnowProtocol(config["epn_peer_mac"], hostname=client_id, channel=config["epn_channel"], timeout_ms=config["epn_timeout_ms"])
         serial_protocol = SerialProtocol(espnow_protocol, mtu_size_bytes=DEFAULT_MTU_SIZE_BYTES)
         min_iot_protocol = MinIotProtocol(serial_protocol)
@@ -153,7 +154,7 @@ class Network(InterfaceProtocol):
         Returns:
             Network: Network instance.
         """
-        client_id = id_prefix + binascii.hexlify(machine.unique_id()).decode("utf-8")
+        client_id = id_prefix + DEVICE_ID
 
         client = MQTT.MQTT(
             client_id=client_id,
@@ -167,16 +168,21 @@ class Network(InterfaceProtocol):
             recv_timeout=config["recv_timeout_sec"],
             socket_timeout=config["socket_timeout_sec"]
         )
-        client.on_connect = on_connect_cb
-        client.on_disconnect = on_disconnect_cb
-        client.on_publish = on_publish_cb
-        client.on_subscribe = on_sub_cb
-        client.on_unsubscribe = on_unsub_cb
-        client.on_message = on_message_cb
+        # Client already defaults all callbacks to None, only override those that are provided
+        for attr, cb in (
+            ("on_connect", on_connect_cb),
+            ("on_disconnect", on_disconnect_cb),
+            ("on_publish", on_publish_cb),
+            ("on_subscribe", on_sub_cb),
+            ("on_unsubscribe", on_unsub_cb),
+            ("on_message", on_message_cb)
+        ):
+            if cb is not None:
+                setattr(client, attr, cb)
         client.enable_logger(logging, log_level=config["logging_level"], logger_name="mqtt")
 
         wifi_protocol = WifiProtocol(secrets["ssid"], secrets["password"], client_id)
-        mqtt_protocol = MqttProtocol(wifi_protocol, client)
+        mqtt_protocol = MqttProtocol(wifi_protocol, client, config.get("mqtt_recv_buffer_size_bytes", None))
 
         return cls(mqtt_protocol)
 
@@ -190,6 +196,6 @@ class Network(InterfaceProtocol):
         Returns:
             Network: Network instance.
         """
-        client_id = id_prefix + binascii.hexlify(machine.unique_id()).decode("utf-8")
+        client_id = id_prefix + DEVICE_ID
 
         return cls(WifiProtocol(secrets["ssid"], secrets["password"], client_id))
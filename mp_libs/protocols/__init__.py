@@ -1,12 +1,28 @@
 """Protocols Module"""
+import io
+import sys
 try:
     from typing import Any, List
 except ImportError:
     pass
 
 
+def format_exception(exc: BaseException) -> str:
+    """Returns the exception's traceback as a string.
+
+    Only call this once the traceback text is actually needed, e.g. right before raising.
+    """
+    buf = io.StringIO()
+    sys.print_exception(exc, buf)  # type: ignore # pylint: disable=no-member
+    return buf.getvalue()
+
+
 class InterfaceProtocol():
     """Pure virtual interface to be implemented by inheriting protocol class"""
+    # Largest msg, in bytes, that send() can handle. None if msgs of any size can be sent, e.g. by
+    # splitting them into MTU sized pieces.
+    MAX_MSG_SIZE_BYTES = None
+
     def __init__(self) -> None:
         pass
 
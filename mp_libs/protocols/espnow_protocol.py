@@ -7,9 +7,7 @@ TODO: Add retry attempts to espnow send?
 
 # Standard imports
 import espnow
-import io
 import struct
-import sys
 import time
 from collections import namedtuple
 from micropython import const
@@ -21,7 +19,7 @@ except ImportError:
 # Third party imports
 from mp_libs import logging
 from mp_libs.enum import Enum
-from mp_libs.protocols import InterfaceProtocol
+from mp_libs.protocols import InterfaceProtocol, format_exception
 from mp_libs.protocols.wifi_protocols import WifiProtocol
 
 # Local imports
@@ -143,10 +141,8 @@ class EspnowPacket():
         try:
             header = EspnowPacketHeader(*struct.unpack(EPN_PACKET_HDR_FORMAT_STR, header_data))
         except (ValueError, TypeError) as exc:
-            buf = io.StringIO()
-            sys.print_exception(exc, buf)  # type: ignore
             raise EspnowPacketError(
-                f"Failed to deserialize packet header: {header_data}\nexc: {buf.getvalue()}")
+                f"Failed to deserialize packet header: {header_data}\nexc: {format_exception(exc)}")
 
         # Validate header
         if header.delim != EPN_PACKET_DELIM:
@@ -173,6 +169,7 @@ class EspnowProtocol(InterfaceProtocol):
 
     # Constants
     ESPNOW_BUFFER_SIZE_BYTES = const(8192)
+    MAX_MSG_SIZE_BYTES = EPN_PACKET_MAX_SIZE - EPN_PACKET_HDR_SIZE_BYTES  # Msgs aren't split across packets
 
     def __init__(
         self,
@@ -217,7 +214,7 @@ class EspnowProtocol(InterfaceProtocol):
                 self.epn.add_peer(peers)
         except OSError as exc:
             if len(exc.args) > 1 and exc.args[1] == "ESP_ERR_ESPNOW_EXIST":
-                logger.warning(f"Peer has already been added, skipping. Peers: {peers}")
+                logger.warning("Peer has already been added, skipping. Peers: %s", peers)
 
         logger.debug("espnow configured")
 
@@ -285,7 +282,7 @@ class EspnowProtocol(InterfaceProtocol):
         Returns:
             Union[EspnowPacket, bytes]: Either the packets bytes payload or the processed packet itself.
         """
-        logger.debug(f"Processing packet: {packet}")
+        logger.debug("Processing packet: %s", packet)
         result = b""
 
         if packet.cmd == EpnCmds.CMD_PASS:
@@ -318,33 +315,36 @@ class EspnowProtocol(InterfaceProtocol):
         data_available = False
         recover = kwargs.get("recover", False)
 
-        # Read as many espnow packets as are available
-        while True:
-            if self.epn.any():
-                data_available = True
+        # Read as many espnow packets as are available. Only failures reading from the radio trigger
+        # recovery, errors processing a packet are left to the caller.
+        any_available = self.epn.any
+        recv = self.epn.recv
+        rxed_data_append = rxed_data.append
+        while any_available():
+            # Read out espnow msg
+            try:
+                mac, msg = recv()
+            except (OSError, ValueError) as exc:
+                logger.exception("Failed receiving espnow packet", exc_info=exc)
+                data_available = False
+                if recover:
+                    if not self.recover():
+                        raise RuntimeError(
+                            f"Failed to recover after espnow receive failure.\n{format_exception(exc)}") from exc
+                else:
+                    raise RuntimeError(f"Did not attempt recovery.\n{format_exception(exc)}") from exc
+
+                # Recovery re-creates the espnow instance, stop draining the old one
+                break
 
-                # Read out espnow msg
-                try:
-                    mac, msg = self.epn.recv()
-                    if mac is None:
-                        break
-                except (OSError, ValueError) as exc:
-                    logger.exception("Failed receiving espnow packet", exc_info=exc)
-                    data_available = False
-                    buf = io.StringIO()
-                    sys.print_exception(exc, buf)  # type: ignore
-                    if recover:
-                        if not self.recover():
-                            raise RuntimeError(f"Failed to recover after espnow receive failure.\n{buf.getvalue()}")
-                    else:
-                        raise RuntimeError(f"Did not attempt recovery.\n{buf.getvalue()}")
-
-                # Process espnow msg
-                packet = EspnowPacket.deserialize(msg)  # type: ignore , We protect against this by checking if mac is None.
-                if payload := self.process_packet(packet):
-                    rxed_data.append(payload)
-            else:
+            if mac is None:
                 break
+            data_available = True
+
+            # Process espnow msg
+            packet = EspnowPacket.deserialize(msg)  # type: ignore , We protect against this by checking if mac is None.
+            if payload := self.process_packet(packet):
+                rxed_data_append(payload)
 
         return data_available
 
@@ -355,13 +355,13 @@ class EspnowProtocol(InterfaceProtocol):
             bool: True if recovery succeeded, False if it failed.
         """
         logger.info("Attempting espnow recovery... ")
-        peers = []
-        for peer in self.epn.get_peers():
-            peers.append(peer[0])
 
+        # Rebuild from the stashed peer macs rather than querying the instance being recovered.
+        # De-activating espnow drops all of its config and peers, so each peer gets re-added.
+        self._network_disable()
         del self.wifi
-        del self.epn
-        self._configure(peers, self.hostname, self.channel, self.timeout_ms)
+        self.epn = espnow.ESPNow()
+        self._configure(list(self.peers), self.hostname, self.channel, self.timeout_ms)
 
         return True
 
@@ -372,7 +372,7 @@ class EspnowProtocol(InterfaceProtocol):
 
         while channel <= 11 and not channel_found:
             channel += 1
-            logger.debug(f"Changing channel to: {channel}")
+            logger.debug("Changing channel to: %d", channel)
             if not self.update_channel(channel):
                 raise RuntimeError(f"Failed to update espnow/wifi channel to {channel}")
 
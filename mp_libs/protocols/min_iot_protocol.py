@@ -11,7 +11,7 @@ TODO: Add support for users to specify their own serializer/deserializer to impr
 # Standard imports
 import json
 import time
-from micropython import const
+import micropython
 try:
     from typing import Dict, List, Optional
 except ImportError:
@@ -29,6 +29,9 @@ except ImportError:
     config = {"logging_level": logging.INFO}
 
 # Constants
+MSG_JSON_FORMAT = '{"topic":%s,"msg":%s}'
+MSG_JSON_FORMAT_TS = '{"topic":%s,"msg":%s,"sent_ts":%d}'
+MSG_JSON_OVERHEAD_BYTES = len(MSG_JSON_FORMAT) - len("%s") * 2  # Min bytes added around the fields
 
 # Globals
 logger: logging.Logger = logging.getLogger("miniot")
@@ -37,6 +40,8 @@ logger.setLevel(config["logging_level"])
 
 class MinIotMessage():
     """Minimal IoT Message definition for use with the MinIotProtocol"""
+    __slots__ = ("topic", "msg", "sent_ts", "received_ts")
+
     def __init__(
         self,
         topic: str,
@@ -44,58 +49,31 @@ class MinIotMessage():
         sent_ts: Optional[int] = None,
         received_ts: Optional[int] = None
     ) -> None:
-        self.data = {
-            "topic": topic,
-            "msg": msg,
-            "sent_ts": sent_ts,
-            "received_ts": received_ts,
-        }
+        self.topic = topic
+        self.msg = msg
+        self.sent_ts = sent_ts
+        self.received_ts = received_ts
 
     def __repr__(self) -> str:
         return self.serialize().decode()
 
     @property
-    def msg(self) -> str:
-        """Get msg attribute"""
-        return self.data["msg"]
-
-    @msg.setter
-    def msg(self, data: str) -> None:
-        """Set msg attribute"""
-        self.data["msg"] = data
-
-    @property
-    def received_ts(self) -> int:
-        """Get received timestamp attribute"""
-        return self.data["received_ts"]
-
-    @received_ts.setter
-    def received_ts(self, ts: int) -> None:
-        """Set received timestamp value"""
-        self.data["received_ts"] = ts
-
-    @property
-    def sent_ts(self):
-        """Get sent timestamp attribute"""
-        return self.data["sent_ts"]
-
-    @sent_ts.setter
-    def sent_ts(self, ts: int) -> None:
-        """Set sent timestamp value."""
-        self.data["sent_ts"] = ts
-
-    @property
-    def topic(self):
-        """Get topic attribute"""
-        return self.data["topic"]
+    def data(self) -> Dict:
+        """Get message fields as a new dict"""
+        return {
+            "topic": self.topic,
+            "msg": self.msg,
+            "sent_ts": self.sent_ts,
+            "received_ts": self.received_ts,
+        }
 
     @classmethod
     def create_from_dict(cls, data: Dict) -> "MinIotMessage":
         return cls(
             topic=data["topic"],
             msg=data["msg"],
-            sent_ts=data["sent_ts"],
-            received_ts=data["received_ts"]
+            sent_ts=data.get("sent_ts", None),
+            received_ts=data.get("received_ts", None)
         )
 
     @classmethod
@@ -106,20 +84,30 @@ class MinIotMessage():
             data (bytes): Bytes object produced by MinIotMessage.serialize().
 
         Returns:
-            MinIotMessage: New instance of MinIoTMessage.
+            MinIotMessage: New instance of MinIoTMessage. received_ts is never on the wire and is
+                left as None for the receiver to stamp.
         """
         msg_data = json.loads(data)
-        msg = MinIotMessage.create_from_dict(msg_data)
+        msg = MinIotMessage(msg_data["topic"], msg_data["msg"], msg_data.get("sent_ts", None))
 
         return msg
 
     def serialize(self) -> bytes:
         """Serialize this message into a bytes object.
 
+        received_ts is receiver-local and is not serialized. sent_ts is only included once set.
+
         Returns:
             bytes: Serialized bytes object representing this packet instance.
         """
-        return json.dumps(self.data).encode("utf-8")
+        # Schema is fixed, so only the string fields need json's escaping
+        sent_ts = self.sent_ts
+        if sent_ts is None:
+            serialized = MSG_JSON_FORMAT % (json.dumps(self.topic), json.dumps(self.msg))
+        else:
+            serialized = MSG_JSON_FORMAT_TS % (json.dumps(self.topic), json.dumps(self.msg), sent_ts)
+
+        return serialized.encode("utf-8")
 
 
 class MinIotProtocol(InterfaceProtocol):
@@ -129,11 +117,14 @@ class MinIotProtocol(InterfaceProtocol):
     Users should create an instance of this class for sending and receiving any messages via the
     Minimal IoT Protocol and should not use instances of the MinIotMessages class directly.
     The recommended transport protocol is SerialProtocol.
+
+    Msg size is only limited by the transport's MAX_MSG_SIZE_BYTES. Transports that split msgs into
+    MTU sized pieces, like SerialProtocol, have no limit.
     """
-    MAX_PACKET_SIZE_BYTES = const(200)
 
     def __init__(self, transport: InterfaceProtocol) -> None:
         self.transport = transport
+        self._rxed_msgs = []  # Reused by receive() to collect raw transport msgs
 
     def connect(self, **kwargs) -> bool:
         """Connects transport.
@@ -170,29 +161,38 @@ class MinIotProtocol(InterfaceProtocol):
             bool: True if data is ready and returned. False if no data available.
         """
         data_available = False
-        rxed_msgs = []
+        rxed_msgs = self._rxed_msgs
+
+        try:
+            if self.transport.receive(rxed_msgs):
+                data_available = True
+                self._drain(rxed_msgs, rxed_data, time.time())
+        finally:
+            # Never carry raw msgs over to the next call, even if receiving or draining failed
+            rxed_msgs.clear()
 
-        if self.transport.receive(rxed_msgs):
+        return data_available
+
+    @micropython.native
+    def _drain(self, rxed_msgs: list, rxed_data: list, now: int) -> None:
+        """Deserializes raw transport msgs into rxed_data, stamping MinIotMessages with now."""
+        for msg in rxed_msgs:
             # If the received msg is a miniot msg, deserialize.
             # If it isn't, just pass it on up, let the upper layers handle it.
-            data_available = True
-            for msg in rxed_msgs:
-                try:
-                    iot_msg = MinIotMessage.deserialize(msg)
-                except (ValueError, KeyError):
-                    rxed_data.append(msg)
-                    continue
-
-                # Attempt to base64 decode the msg payload in case it is a bytes/bytearray payload
-                try:
-                    iot_msg.msg = base64.b64decode(iot_msg.msg, validate=True)
-                except (base64.BinasciiError, TypeError, ValueError):
-                    pass
-
-                iot_msg.received_ts = time.time()
-                rxed_data.append(iot_msg)
+            try:
+                iot_msg = MinIotMessage.deserialize(msg)
+            except (ValueError, KeyError):
+                rxed_data.append(msg)
+                continue
 
-        return data_available
+            # Attempt to base64 decode the msg payload in case it is a bytes/bytearray payload
+            try:
+                iot_msg.msg = base64.b64decode(iot_msg.msg, validate=True)
+            except (base64.BinasciiError, TypeError, ValueError):
+                pass
+
+            iot_msg.received_ts = now
+            rxed_data.append(iot_msg)
 
     def scan(self, **kwargs) -> List:
         """Performs scan operation.
@@ -240,6 +240,22 @@ class MinIotProtocol(InterfaceProtocol):
         Returns:
             bool: True if successful, False if failed.
         """
+        # Only enforce a size limit for transports that can't split up large msgs
+        max_size = self.transport.MAX_MSG_SIZE_BYTES
+
+        # Reject str msgs that can't possibly fit before paying for serialization
+        if max_size is not None and isinstance(msg.msg, str):
+            min_size = len(msg.msg) + len(msg.topic or "") + MSG_JSON_OVERHEAD_BYTES
+            if min_size > max_size:
+                logger.error(
+                    "MinIoT msg too large for %s. Min size: %d, max size: %d", self.transport, min_size, max_size)
+                return False
+
         msg.sent_ts = time.time()
+        serialized_msg = msg.serialize()
+        if max_size is not None and len(serialized_msg) > max_size:
+            logger.error(
+                "MinIoT msg too large for %s. Size: %d, max size: %d", self.transport, len(serialized_msg), max_size)
+            return False
 
-        return self.transport.send(msg.serialize())
+        return self.transport.send(serialized_msg)
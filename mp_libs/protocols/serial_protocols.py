@@ -393,7 +393,7 @@ class SerialProtocol(InterfaceProtocol):
         """
         # Construct serial packet
         serial_packet = SerialPacket.deserialize(packet)
-        logger.debug(f"{serial_packet.header}")
+        logger.debug("%s", serial_packet.header)
 
         # Check msg ID
         if not self.curr_msg_id:
@@ -4,20 +4,19 @@
 # Standard imports
 import binascii
 import gc
-import io
+import socket
+import time
 import machine
 import network
-import sys
-import time
 from micropython import const
 try:
-    from typing import List
+    from typing import List, Optional
 except ImportError:
     pass
 
 # Third party imports
 from mp_libs import logging
-from mp_libs.protocols import InterfaceProtocol
+from mp_libs.protocols import InterfaceProtocol, format_exception
 from mp_libs.adafruit_minimqtt import adafruit_minimqtt as MQTT
 
 # Local imports
@@ -64,35 +63,32 @@ class WifiProtocol(InterfaceProtocol):
 
     def _connect_wifi(self, max_connect_attempts: int = 3, verbose: bool = False) -> bool:
         success = True
+        sta = self._sta  # Bound once, used repeatedly in the retry loop
 
-        if not self._sta.isconnected():
+        if not sta.isconnected():
             attempt = 1
 
-            while not self._sta.isconnected():
-                logger.debug(f"Connecting to AP: {self._ssid}")
-
-                if verbose:
-                    networks = self._sta.scan()
+            while not sta.isconnected():
+                logger.debug("Connecting to AP: %s", self._ssid)
 
+                # Scanning blocks for seconds and is only used for logging, skip it unless it'll be seen
+                if verbose and logger.isEnabledFor(logging.DEBUG):
                     # Each network is a tuple with the following data:
                     # (ssid, bssid, channel, RSSI, security, hidden)
-                    networks = sorted(
-                        networks, key=lambda net: net[3], reverse=True)
-
-                    for net in networks:
-                        logger.debug(f"ssid: {net[0]}, rssi: {net[3]}")
+                    for net in sta.scan():
+                        logger.debug("ssid: %s, rssi: %d", net[0], net[3])
 
                 try:
-                    self._sta.connect(self._ssid, self._password)
+                    sta.connect(self._ssid, self._password)
                 except (RuntimeError, OSError) as exc:
-                    logger.exception(f"Could not connect to wifi AP: {self._ssid}", exc_info=exc)
+                    logger.exception("Could not connect to wifi AP: %s", self._ssid, exc_info=exc)
 
                 try:
-                    self._wait_for(self._sta.isconnected)
+                    self._wait_for(sta.isconnected)
                 except RuntimeError as exc:
-                    logger.exception(f"Timed out connecting to wifi AP: {self._ssid}", exc_info=exc)
+                    logger.exception("Timed out connecting to wifi AP: %s", self._ssid, exc_info=exc)
 
-                if not self._sta.isconnected():
+                if not sta.isconnected():
                     if attempt >= max_connect_attempts:
                         break
                     logger.warning("Retrying in 3 seconds...")
@@ -101,11 +97,11 @@ class WifiProtocol(InterfaceProtocol):
 
                 gc.collect()
 
-            if not self._sta.isconnected():
-                logger.error(f"Failed to connect to Wifi after {max_connect_attempts} attempts!")
+            if not sta.isconnected():
+                logger.error("Failed to connect to Wifi after %d attempts!", max_connect_attempts)
                 success = False
             else:
-                logger.info(f"Wifi is connected: {self._sta.ifconfig()}")
+                logger.info("Wifi is connected: %s", sta.ifconfig())
         else:
             logger.info("Wifi is already connected")
 
@@ -218,16 +214,44 @@ class MqttProtocol(InterfaceProtocol):
     This protocol will send and receive MQTT via the provided transport protocol. In this case,
     the transport must be a WifiProtocol instance.
     """
-    def __init__(self, transport: WifiProtocol, mqtt_client: MQTT.MQTT) -> None:
+
+    # Constants
+    IDLE_LOOP_TIMEOUTS_MS = (0, 10, 50, 250)  # Loop timeout backoff steps for adaptive receive
+
+    def __init__(
+        self,
+        transport: WifiProtocol,
+        mqtt_client: MQTT.MQTT,
+        recv_buffer_size: Optional[int] = None
+    ) -> None:
         super().__init__()
         self._transport = transport
         self._mqtt_client = mqtt_client
+        self._recv_buffer_size = recv_buffer_size
+        self._idle_ticks = 0  # Consecutive adaptive receive calls that returned no packets
 
         self._transport.disconnect(force=True)
 
     def __repr__(self) -> str:
         return "MQTT"
 
+    def _set_recv_buffer_size(self) -> None:
+        # Larger socket receive buffers let the client's many small reads be served without
+        # waiting on the network stack. Not every port/socket supports SO_RCVBUF, just warn if not.
+        sock = self._mqtt_client._sock  # pylint: disable=protected-access
+        if self._recv_buffer_size is None or sock is None:
+            return
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._recv_buffer_size)
+        except (AttributeError, OSError) as exc:
+            logger.warning("Failed to set MQTT socket recv buffer size: %s", exc)
+
+    def _connect_mqtt(self) -> None:
+        # Shared by connect and recover so every new socket gets the configured recv buffer size
+        self._mqtt_client.connect()
+        self._set_recv_buffer_size()
+
     def connect(self, **kwargs) -> bool:
         """Connects mqtt client (device) to mqtt broker.
 
@@ -249,7 +273,7 @@ class MqttProtocol(InterfaceProtocol):
 
         if not self._mqtt_client.is_connected() or force is True:
             try:
-                self._mqtt_client.connect()
+                self._connect_mqtt()
             except (OSError, ValueError, RuntimeError, MQTT.MMQTTException) as exc:
                 logger.exception("Failed to connect MQTT!", exc_info=exc)
                 success = False
@@ -304,6 +328,10 @@ class MqttProtocol(InterfaceProtocol):
         Args:
             rxed_data (list): Not used.
             recover (bool, optional): Attempt recovery if loop function fails.
+            timeout_ms (int, optional): How long the loop function waits for messages. Default is 0.
+            adaptive (bool, optional): Ignore `timeout_ms` and instead back off the loop timeout
+                through IDLE_LOOP_TIMEOUTS_MS while no PUBLISH packets are received, resetting as soon
+                as one is. Default is False.
 
         Raises:
             RuntimeError: Failed running loop function and failed to recover connection.
@@ -314,19 +342,30 @@ class MqttProtocol(InterfaceProtocol):
         """
         data_available = True
         recover = kwargs.get("recover", False)
+        adaptive = kwargs.get("adaptive", False)
+        if adaptive:
+            timeout_ms = self.IDLE_LOOP_TIMEOUTS_MS[self._idle_ticks]
+        else:
+            timeout_ms = kwargs.get("timeout_ms", 0)
 
         try:
-            self._mqtt_client.loop()
+            rcs = self._mqtt_client.loop(timeout=timeout_ms / 1000)
         except (ValueError, RuntimeError, OSError, MQTT.MMQTTException) as exc:
             logger.exception("MQTT loop failure", exc_info=exc)
             data_available = False
-            buf = io.StringIO()
-            sys.print_exception(exc, buf)
             if recover:
                 if not self.recover():
-                    raise RuntimeError(f"Failed to recover after MQTT loop failure.\n{buf.getvalue()}")
+                    raise RuntimeError(
+                        f"Failed to recover after MQTT loop failure.\n{format_exception(exc)}") from exc
             else:
-                raise RuntimeError(f"Did not attempt recovery.\n{buf.getvalue()}")
+                raise RuntimeError(f"Did not attempt recovery.\n{format_exception(exc)}") from exc
+        else:
+            if adaptive:
+                # Only PUBLISH packets count as traffic, keepalive PINGRESPs also show up in rcs
+                if rcs and MQTT.MQTT_PUBLISH in rcs:
+                    self._idle_ticks = 0
+                elif self._idle_ticks < len(self.IDLE_LOOP_TIMEOUTS_MS) - 1:
+                    self._idle_ticks += 1
 
         return data_available
 
@@ -361,41 +400,49 @@ class MqttProtocol(InterfaceProtocol):
         """
         return self._transport.scan(**kwargs)
 
-    def send(self, msg: str, **kwargs) -> bool:
+    def send(
+        self,
+        msg: str,
+        topic: str = None,
+        retain: bool = False,
+        qos: int = 0,
+        recover: bool = False,
+        **kwargs
+    ) -> bool:
         """Synchronously sends msg and topic to MQTT broker.
 
         Args:
             msg (str): MQTT message
-            topic (str): MQTT topic
+            topic (str): MQTT topic. Required, defaults to None only to stay call compatible with
+                InterfaceProtocol.send.
             retain (bool, optional): Set retain flag or not. Default is False.
             qos (int, optional): Set qos level. Default is 0.
             recover (bool, optional): Attempt recovery if send fails.
 
         Raises:
+            ValueError: No topic provided.
             RuntimeError: Failed to send message and failed to recover MQTT connection.
             RuntimeError: Failed to send message, but did not attempt recovery.
 
         Returns:
             bool: True if successful, False if failed.
         """
+        if topic is None:
+            raise ValueError("MQTT send requires a topic")
+
         success = True
-        topic = kwargs["topic"]
-        retain = kwargs.get("retain", False)
-        qos = kwargs.get("qos", 0)
-        recover = kwargs.get("recover", False)
 
         try:
             self._mqtt_client.publish(topic, msg, retain=retain, qos=qos)
         except (ValueError, RuntimeError, OSError, MQTT.MMQTTException) as exc:
             logger.exception("MQTT send failed.", exc_info=exc)
             success = False
-            buf = io.StringIO()
-            sys.print_exception(exc, buf)
             if recover:
                 if not self.recover():
-                    raise RuntimeError(f"Failed to recover after MQTT send failure.\n{buf.getvalue()}")
+                    raise RuntimeError(
+                        f"Failed to recover after MQTT send failure.\n{format_exception(exc)}") from exc
             else:
-                raise RuntimeError(f"Did not attempt recovery.\n{buf.getvalue()}")
+                raise RuntimeError(f"Did not attempt recovery.\n{format_exception(exc)}") from exc
 
         return success
 